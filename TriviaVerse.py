@@ -1,52 +1,178 @@
 import streamlit as st
-import wikipedia
+import aiohttp
+import asyncio
+import diskcache
 import random
+import re
 import requests
-import time # For animation delays
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Set Wikipedia language
-wikipedia.set_lang("en")
+# MediaWiki API endpoint (English Wikipedia)
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
 
-# Helper: Get summary and title
-@st.cache_data(ttl=3600) # Cache results for an hour
-def get_random_wikipedia_summary(category):
-    try:
-        # Increased search limit to get more diverse results
-        page_titles = wikipedia.search(category, results=50)
-        if not page_titles:
-            return None, None
-        
-        # Filter out disambiguation pages and very short titles
-        valid_titles = [
-            title for title in page_titles 
-            if "(disambiguation)" not in title and len(title) > 5
-        ]
-        if not valid_titles:
-            return None, None
-            
-        title = random.choice(valid_titles)
-        summary = wikipedia.summary(title, sentences=3) # Increased sentences for more context
-        return title, summary
-    except wikipedia.exceptions.DisambiguationError as e:
-        # Handle disambiguation errors by trying another option
-        if e.options:
-            for option in random.sample(e.options, min(len(e.options), 5)):
-                try:
-                    summary = wikipedia.summary(option, sentences=3)
-                    return option, summary
-                except:
-                    continue
-        return None, None
-    except Exception as e:
-        st.error(f"Error fetching Wikipedia summary: {e}")
-        return None, None
+# Compiled once; title filters run over every search hit
+_DISAMBIGUATION_RE = re.compile(r"\(disambiguation\)")
+
+# Disk-backed cache so API results survive server restarts (Streamlit's
+# in-memory caches are wiped on every redeploy)
+disk_cache = diskcache.Cache("/tmp/triviaverse")
+disk_cache.stats(enable=True)
+
+async def fetch_json(session, params):
+    # Single JSON round-trip against the MediaWiki API
+    async with session.get(WIKIPEDIA_API_URL, params={**params, "format": "json"}) as response:
+        response.raise_for_status()
+        return await response.json()
+
+# Pooled HTTP session with keep-alive, shared across reruns, so repeated
+# synchronous API calls skip the TCP/TLS handshake
+@st.cache_resource
+def http():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=20, pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.5),
+    )
+    session.mount("https://", adapter)
+    return session
+
+# One big batch of random titles shared by the whole process; sampling
+# distractors from it is free compared to an HTTP round-trip per question
+@st.cache_resource(ttl=3600)
+@disk_cache.memoize(expire=3600)
+def random_title_pool():
+    response = http().get(WIKIPEDIA_API_URL, params={
+        "action": "query", "list": "random",
+        "rnnamespace": 0, "rnlimit": 500, "format": "json",
+    })
+    response.raise_for_status()
+    return [page["title"] for page in response.json()["query"]["random"]]
+
+# Direct list=search call through the pooled session; srprop= strips the
+# snippet/metadata fields we never read, shrinking the response
+def search_titles(query, limit=50):
+    response = http().get(WIKIPEDIA_API_URL, params={
+        "action": "query", "list": "search", "srsearch": query,
+        "srlimit": limit, "srprop": "", "format": "json",
+    })
+    response.raise_for_status()
+    return [hit["title"] for hit in response.json()["query"]["search"]]
+
+# One search per category, cached for the hour, instead of re-running
+# the same search for every question in a quiz. srlimit maxes out at 50
+# for non-bot clients, so ask for exactly that
+@st.cache_data(ttl=3600)
+def category_pool(category):
+    return search_titles(category, limit=50)
+
+async def build_mcq(session, category, page_titles, random_titles):
+    # Filter out disambiguation pages and very short titles
+    valid_titles = [
+        title for title in page_titles
+        if len(title) > 5 and not _DISAMBIGUATION_RE.search(title)
+    ]
+    if not valid_titles:
+        return None
+
+    title = random.choice(valid_titles)
+
+    # Wrong-answer candidates: other search hits mixed with some truly
+    # random pages
+    wrong_answers_pool = [
+        res for res in page_titles
+        if res != title and not _DISAMBIGUATION_RE.search(res)
+    ]
+    wrong_answers_pool.extend(
+        random.sample(random_titles, min(5, len(random_titles)))
+    )
+
+    # Build the full candidate set up front, then fetch every extract plus
+    # the Wikidata ids in ONE batched call (the API accepts up to 50
+    # pipe-separated titles) instead of one round-trip per title.
+    # exsentences lets the server truncate to 3 sentences before
+    # serializing, so we never download whole article intros
+    candidates = [title] + wrong_answers_pool[:10]
+    batch_data = await fetch_json(session, {
+        "action": "query", "prop": "extracts|pageprops",
+        "exintro": 1, "explaintext": 1, "exsentences": 3,
+        "titles": "|".join(candidates[:50]),
+    })
+    pages = list(batch_data["query"]["pages"].values())
+    extracts = {
+        page["title"]: page["extract"]
+        for page in pages if page.get("extract")
+    }
+    wikidata_ids = {
+        page["title"]: page["pageprops"]["wikibase_item"]
+        for page in pages if page.get("pageprops", {}).get("wikibase_item")
+    }
+
+    # Fall back to another candidate if the chosen title has no extract
+    # (e.g. an unresolved disambiguation page)
+    if title not in extracts:
+        usable = [t for t in valid_titles if t in extracts]
+        if not usable:
+            return None
+        title = random.choice(usable)
+
+    summary = extracts[title] # Already truncated to 3 sentences server-side
+    wikidata_id = wikidata_ids.get(title)
+
+    correct_answer = title
+
+    # Dedupe while preserving insertion order, then sample with an rng
+    # seeded on (category, answer) so a given question is reproducible
+    # and cache-friendly
+    rng = random.Random(hash((category, correct_answer)))
+    wrong_answers = list(dict.fromkeys(
+        ans for ans in wrong_answers_pool if ans != correct_answer
+    ))[:10]
+
+    options = rng.sample(wrong_answers, min(3, len(wrong_answers))) + [correct_answer]
+    rng.shuffle(options)
+
+    return {
+        "question": f"What Wikipedia article is this summary from?\n\n***{summary}***",
+        "options": options,
+        "answer": correct_answer,
+        "wikidata_id": wikidata_id,
+    }
+
+async def _generate_mcq_async(category):
+    # aiohttp sessions are tied to the event loop asyncio.run creates, so a
+    # fresh session is opened per run; connections are still reused across
+    # the concurrent requests within a question
+    page_titles = category_pool(category)
+    random_titles = random_title_pool()
+    async with aiohttp.ClientSession() as session:
+        return await build_mcq(session, category, page_titles, random_titles)
+
+async def prefetch_pool(category, count):
+    # Build a whole batch of candidate questions concurrently so the quiz
+    # pays one parallel round-trip instead of one fetch per question.
+    # Dedupe by answer as results resolve.
+    page_titles = category_pool(category)
+    random_titles = random_title_pool()
+    async with aiohttp.ClientSession() as session:
+        questions = []
+        seen_answers = set()
+        for task in asyncio.as_completed([build_mcq(session, category, page_titles, random_titles) for _ in range(count)]):
+            question = await task
+            if question and question["answer"] not in seen_answers:
+                seen_answers.add(question["answer"])
+                questions.append(question)
+        return questions
 
 # Helper: Get Wikidata ID (used for potential future extensions, e.g., fetching more facts)
 @st.cache_data(ttl=3600)
+@disk_cache.memoize(expire=86400)
 def get_wikidata_item_id(title):
     try:
-        response = requests.get(
-            f"https://en.wikipedia.org/w/api.php?action=query&titles={title}&prop=pageprops&format=json"
+        response = http().get(
+            WIKIPEDIA_API_URL,
+            params={"action": "query", "titles": title, "prop": "pageprops", "format": "json"},
         )
         data = response.json()
         pages = data["query"]["pages"]
@@ -59,54 +185,35 @@ def get_wikidata_item_id(title):
         st.error(f"Error fetching Wikidata ID: {e}")
         return None
 
+# Shared worker pool for pre-fetching questions in the background
+@st.cache_resource
+def executor():
+    return ThreadPoolExecutor(max_workers=2)
+
 # Generate MCQ question
 def generate_mcq(category):
-    title, summary = get_random_wikipedia_summary(category)
-    if not summary:
+    try:
+        return asyncio.run(_generate_mcq_async(category))
+    except Exception as e:
+        st.error(f"Error fetching Wikipedia summary: {e}")
         return None
 
-    correct_answer = title
-    
-    # Generate more relevant wrong answers
-    wrong_answers_pool = []
+# Generate several candidate questions in one parallel batch, so a
+# duplicate hit costs a local filter instead of another round-trip
+def generate_mcq_batch(category, count=5):
     try:
-        # Try to get related pages from Wikipedia or search within the category
-        search_results = wikipedia.search(category, results=10)
-        wrong_answers_pool.extend([
-            res for res in search_results 
-            if res != correct_answer and "(disambiguation)" not in res
-        ])
-        
-        # Also include some truly random pages to mix it up
-        wrong_answers_pool.extend(wikipedia.random(pages=5))
-
+        return asyncio.run(prefetch_pool(category, count))
     except Exception as e:
-        st.warning(f"Could not fetch diverse wrong answers, using random pages. Error: {e}")
-        wrong_answers_pool.extend(wikipedia.random(pages=8)) # Fallback
-
-    # Ensure unique and sufficient wrong answers
-    wrong_answers = list(set([ans for ans in wrong_answers_pool if ans != correct_answer]))
-    
-    if len(wrong_answers) < 3:
-        # Fallback if not enough diverse wrong answers are found
-        wrong_answers.extend(random.sample(wikipedia.random(pages=5), 3 - len(wrong_answers)))
-    
-    wrong_answers = random.sample(wrong_answers, min(3, len(wrong_answers)))
-
-    options = wrong_answers + [correct_answer]
-    random.shuffle(options)
-
-    return {
-        "question": f"What Wikipedia article is this summary from?\n\n***{summary}***",
-        "options": options,
-        "answer": correct_answer
-    }
+        st.error(f"Error fetching Wikipedia summary: {e}")
+        return []
 
 # Streamlit UI
 st.set_page_config(page_title="TriviaVerse Quiz", layout="centered", initial_sidebar_state="expanded")
 
-# Custom CSS for better aesthetics and animations
-st.markdown("""
+# Custom CSS for better aesthetics and animations. Built once at import
+# time; Streamlit hashes the unchanged element on reruns and the frontend
+# keeps it, so no re-render work is done per click.
+CUSTOM_CSS = """
 <style>
     .main {
         background-color: #f0f2f6;
@@ -154,7 +261,7 @@ st.markdown("""
         padding: 10px;
         border-radius: 5px;
         margin-top: 10px;
-        animation: slideInRight 0.5s ease-out;
+        animation: slideInRight 1.5s ease-out;
     }
     .incorrect-feedback {
         background-color: #ffe6e6;
@@ -162,7 +269,7 @@ st.markdown("""
         padding: 10px;
         border-radius: 5px;
         margin-top: 10px;
-        animation: shake 0.5s ease-out;
+        animation: shake 1.5s ease-out;
     }
     .stProgress > div > div > div > div {
         background-color: #2F80ED;
@@ -197,7 +304,8 @@ st.markdown("""
         animation: pulse 1s infinite;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 st.title("🧠 TriviaVerse Quiz")
 st.markdown("##### _A smart quiz powered by Wikipedia & Wikidata_")
@@ -212,6 +320,12 @@ with st.sidebar:
     
     num_questions = st.number_input("Number of Questions", min_value=3, max_value=20, value=5, step=1)
     
+    st.markdown("---")
+    with st.expander("Cache stats"):
+        cache_hits, cache_misses = disk_cache.stats()
+        st.write(f"Disk cache hits: {cache_hits}")
+        st.write(f"Disk cache misses: {cache_misses}")
+
     st.markdown("---")
     st.write("Developed with ❤️ by Your Name")
 
@@ -226,6 +340,20 @@ if "current_question_data" not in st.session_state:
     st.session_state.current_question_data = None
 if "quiz_started" not in st.session_state:
     st.session_state.quiz_started = False
+if "question_pool" not in st.session_state:
+    st.session_state.question_pool = []
+
+# Feedback for the previous answer (animates for 1.5s via CSS); shown on
+# the next question and on the end screen after the final submit
+def render_last_feedback():
+    last_feedback = st.session_state.pop("last_feedback", None)
+    if last_feedback:
+        feedback_kind, feedback_message = last_feedback
+        st.markdown(f'<div class="{feedback_kind}-feedback">{feedback_message}</div>', unsafe_allow_html=True)
+        if feedback_kind == "correct":
+            st.balloons() # Fun animation for correct answer
+        else:
+            st.snow() # Another animation for incorrect answer
 
 # Start Quiz Button
 if not st.session_state.quiz_started:
@@ -236,34 +364,83 @@ if not st.session_state.quiz_started:
         st.session_state.question_number = 1
         st.session_state.questions_asked = []
         st.session_state.current_question_data = None
-        st.experimental_rerun() # Rerun to start the quiz interface
+        st.session_state.pop("last_feedback", None) # No stale verdicts from a previous quiz
+        # Pre-warm all questions for the quiz in one parallel batch (2x for
+        # dedup headroom) so per-question fetches become local pops
+        with st.spinner("Preparing your quiz..."):
+            try:
+                st.session_state.question_pool = asyncio.run(prefetch_pool(category, num_questions * 2))
+            except Exception as e:
+                # Not fatal: the per-question fetch paths can still fill in
+                st.error(f"Error pre-fetching questions: {e}")
+                st.session_state.question_pool = []
+            st.session_state.pool_category = category
+        st.rerun() # Rerun to start the quiz interface
 else:
-    # Progress Bar
-    progress_percentage = (st.session_state.question_number - 1) / num_questions
-    st.progress(progress_percentage, text=f"Question {st.session_state.question_number-1}/{num_questions}")
-
     # --- Question Generation and Display ---
-    if st.session_state.question_number <= num_questions:
+    # A fragment so answer submissions rerun only this panel, skipping the
+    # sidebar, CSS, and page chrome on every click
+    @st.fragment
+    def question_panel():
+        # Progress Bar
+        progress_percentage = (st.session_state.question_number - 1) / num_questions
+        st.progress(progress_percentage, text=f"Question {st.session_state.question_number-1}/{num_questions}")
+
+        render_last_feedback()
+
         if st.session_state.current_question_data is None:
             with st.spinner("Fetching a new question..."):
-                # Try generating unique questions
-                max_attempts = 5
-                attempts = 0
-                while attempts < max_attempts:
-                    new_question_data = generate_mcq(category)
-                    if new_question_data and new_question_data["answer"] not in [q["answer"] for q in st.session_state.questions_asked]:
-                        st.session_state.current_question_data = new_question_data
-                        st.session_state.questions_asked.append(new_question_data)
-                        break
-                    attempts += 1
-                if attempts == max_attempts:
-                    st.warning("Couldn't fetch a unique question. Please try changing the category or restarting.")
-                    st.session_state.quiz_started = False # End quiz if no new questions
-                    st.stop() # Stop execution to prevent errors
+                asked_answers = [q["answer"] for q in st.session_state.questions_asked]
+
+                # Prefer the pool pre-warmed at quiz start
+                if st.session_state.get("pool_category") == category:
+                    while st.session_state.question_pool:
+                        candidate = st.session_state.question_pool.pop()
+                        if candidate["answer"] not in asked_answers:
+                            st.session_state.current_question_data = candidate
+                            st.session_state.questions_asked.append(candidate)
+                            break
+
+                # Then the question pre-fetched in the background (if it's
+                # ready, unique, and still matches the selected category)
+                if st.session_state.current_question_data is None:
+                    prefetched = None
+                    future = st.session_state.get("next_question_future")
+                    if future is not None and future.done() and st.session_state.get("prefetch_category") == category:
+                        prefetched = future.result()
+                        st.session_state.next_question_future = None
+                    if prefetched and prefetched["answer"] not in asked_answers:
+                        st.session_state.current_question_data = prefetched
+                        st.session_state.questions_asked.append(prefetched)
+
+                # Fall back to one parallel batch of candidates, filtered
+                # locally for uniqueness (no sequential retry round-trips)
+                if st.session_state.current_question_data is None:
+                    candidates = [
+                        c for c in generate_mcq_batch(category, 5)
+                        if c["answer"] not in asked_answers
+                    ]
+                    if candidates:
+                        chosen = candidates.pop()
+                        st.session_state.current_question_data = chosen
+                        st.session_state.questions_asked.append(chosen)
+                        # Bank the leftovers for upcoming questions
+                        if st.session_state.get("pool_category") == category:
+                            st.session_state.question_pool.extend(candidates)
+                    else:
+                        st.warning("Couldn't fetch a unique question. Please try changing the category or restarting.")
+                        st.session_state.quiz_started = False # End quiz if no new questions
+                        st.stop() # Stop execution to prevent errors
 
         question_data = st.session_state.current_question_data
-        
+
         if question_data:
+            # Kick off the NEXT question in the background while the user
+            # reads this one, so the post-submit fetch is usually instant
+            if st.session_state.get("next_question_future") is None or st.session_state.get("prefetch_category") != category:
+                st.session_state.next_question_future = executor().submit(generate_mcq, category)
+                st.session_state.prefetch_category = category
+
             st.markdown(f"### Question {st.session_state.question_number}")
             st.markdown(question_data["question"])
 
@@ -273,25 +450,32 @@ else:
 
             if submit_button:
                 if choice == question_data["answer"]:
-                    st.markdown('<div class="correct-feedback">Correct! 🎉 Well done!</div>', unsafe_allow_html=True)
-                    st.balloons() # Fun animation for correct answer
                     st.session_state.score += 1
+                    st.session_state.last_feedback = ("correct", 'Correct! 🎉 Well done!')
                 else:
-                    st.markdown(f'<div class="incorrect-feedback">Oops! The correct answer was **{question_data["answer"]}**. Better luck next time!</div>', unsafe_allow_html=True)
-                    st.snow() # Another animation for incorrect answer
+                    st.session_state.last_feedback = ("incorrect", f'Oops! The correct answer was **{question_data["answer"]}**. Better luck next time!')
 
-                # Prepare for next question
+                # Prepare for next question and rerun immediately; the
+                # feedback animates client-side on the next run instead of
+                # blocking a server worker with time.sleep
                 st.session_state.question_number += 1
                 st.session_state.current_question_data = None # Clear current question
-                
-                # Small delay for animations to be seen
-                time.sleep(1.5) 
-                st.experimental_rerun() # Rerun to load next question or end quiz
+                if st.session_state.question_number <= num_questions:
+                    st.rerun(scope="fragment") # Only this panel reruns
+                else:
+                    st.rerun() # Full rerun to reach the end screen
         else:
             st.warning("Couldn't fetch question. Try a different category or restart the quiz.")
             st.session_state.quiz_started = False # Reset quiz state if questions can't be loaded
+
+        # Inside the fragment so fragment-scoped reruns keep it current
+        st.markdown(f'<div class="score-display">Current Score: {st.session_state.score}</div>', unsafe_allow_html=True)
+
+    if st.session_state.question_number <= num_questions:
+        question_panel()
     else:
         # --- Quiz End Screen ---
+        render_last_feedback() # Verdict on the final question
         st.balloons()
         st.success("🎉 Quiz Completed! 🎉")
         final_score_msg = f"You scored **{st.session_state.score}** out of **{num_questions}** questions!"
@@ -310,6 +494,5 @@ else:
             st.session_state.question_number = 1
             st.session_state.questions_asked = []
             st.session_state.current_question_data = None
-            st.experimental_rerun()
-
-    st.markdown(f'<div class="score-display">Current Score: {st.session_state.score}</div>', unsafe_allow_html=True)
+            st.session_state.pop("last_feedback", None)
+            st.rerun()